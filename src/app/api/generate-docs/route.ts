@@ -14,6 +14,7 @@ import {
   convertInchesToTwip
 } from 'docx';
 import { createDocxFromDocumentation } from '@/lib/docx-util';
+import { hashText } from '@/lib/doc-cache';
 
 // OpenAI calls will now be made client-side to avoid serverless timeouts
 
@@ -338,9 +339,37 @@ function createStyledTable(tableRows: string[][]) {
   });
 }
 
+// Recently built DOCX files keyed by a hash of the raw request body, so repeat downloads
+// of the same documentation skip the rebuild. Least recently used entries are evicted first.
+const DOCX_CACHE_MAX_ENTRIES = 8;
+const docxCache = new Map<string, Buffer>();
+
+async function buildDocxCached(
+  key: string,
+  documentation: Documentation,
+  filename: string
+): Promise<Buffer> {
+  const cached = docxCache.get(key);
+  if (cached) {
+    // Re-insert to mark as most recently used
+    docxCache.delete(key);
+    docxCache.set(key, cached);
+    return cached;
+  }
+
+  const buffer = await Packer.toBuffer(createDocxFromDocumentation(documentation, filename));
+  docxCache.set(key, buffer);
+  if (docxCache.size > DOCX_CACHE_MAX_ENTRIES) {
+    const oldestKey = docxCache.keys().next().value;
+    if (oldestKey !== undefined) docxCache.delete(oldestKey);
+  }
+  return buffer;
+}
+
 export async function POST(request: NextRequest) {
-  const body = await request.json();
-  const { documentation, filename, format } = body;
+  // Keep the raw body: hashing it gives the cache key without re-serializing the documentation
+  const rawBody = await request.text();
+  const { documentation, filename, format } = JSON.parse(rawBody);
 
   // Basic payload validation
   if (!documentation) {
@@ -350,8 +379,7 @@ export async function POST(request: NextRequest) {
   // For DOCX generation only (JSON documentation is now passed from client)
   if (format === 'docx') {
     try {
-      const doc = createDocxFromDocumentation(documentation, filename || 'documentation');
-      const buffer = await Packer.toBuffer(doc);
+      const buffer = await buildDocxCached(hashText(rawBody), documentation, filename || 'documentation');
 
       return new NextResponse(buffer, {
         headers: {
@@ -1,9 +1,9 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { createJob, updateJob } from '@/lib/job-store';
-import OpenAI from 'openai';
+import { getOpenAIClient } from '@/lib/openai-client';
 import { after } from 'next/server';
 
-const openai = new OpenAI({ apiKey: process.env.OPENAI_API_KEY });
+const openai = getOpenAIClient();
 
 export const maxDuration = 60;
 
@@ -52,6 +52,15 @@ Additional Guidance:
 - WRITE ALL INTEGRATION RULES IN THE "integratedRules" FIELD. WRITE ALL STEPS DONT LEAVE ANYTHING OUT.
 `;
 
+const SYSTEM_ROLE =
+  'You are a technical documentation expert specializing in data pipeline and analytics code documentation for a business audience. Your task is to help business users understand Python code related to sales representative activities with doctors and hospitals. You create comprehensive, structured documentation that follows specific business templates for data processing workflows, ensuring all KPIs are explained in their business context. You must explain technical steps in terms of their business impact and logic.';
+
+// Static template goes in the system message so the prompt prefix is stable across requests
+const SYSTEM_MESSAGE = {
+  role: 'system' as const,
+  content: `${SYSTEM_ROLE}\n\n${DOCUMENTATION_TEMPLATE}`,
+};
+
 export async function POST(request: NextRequest) {
   try {
     const { pythonCode, filename, existingExcel } = await request.json();
@@ -86,22 +95,18 @@ async function processInBackground(jobId: string, pythonCode: string, filename:
     updateJob(jobId, { status: 'processing', progress: 'Starting OpenAI analysis...' });
 
     // Build user prompt with optional Excel content
-    let userContent = `${DOCUMENTATION_TEMPLATE}\n\nPython file: ${filename}\n\nPython Code:\n\`\`\`python\n${pythonCode}\n\`\`\``;
+    let userContent = `Python file: ${filename}\n\nPython Code:\n\`\`\`python\n${pythonCode}\n\`\`\``;
     if (existingExcel) {
       userContent += `\n\nExisting Excel Data (CSV format of first sheet):\n\`\`\`csv\n${existingExcel}\n\`\`\``;
     }
-    userContent += `\n\nPlease generate the documentation following the exact template format provided above.`;
+    userContent += `\n\nPlease generate the documentation following the exact template format provided in the system instructions.`;
 
     const completion = await openai.chat.completions.create({
       model: process.env.OPENAI_MODEL || 'o3-2025-04-16',
       response_format: { type: 'json_object' },
       stream: true,
       messages: [
-        {
-          role: 'system',
-          content:
-            'You are a technical documentation expert specializing in data pipeline and analytics code documentation for a business audience. Your task is to help business users understand Python code related to sales representative activities with doctors and hospitals. You create comprehensive, structured documentation that follows specific business templates for data processing workflows, ensuring all KPIs are explained in their business context. You must explain technical steps in terms of their business impact and logic.',
-        },
+        SYSTEM_MESSAGE,
         {
           role: 'user',
           content: userContent,
@@ -1,6 +1,7 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { chunkPythonCode, chunkDocumentation, chunkQA, chunkKPI, DocumentChunk } from '@/lib/chunking';
 import { embedAndStoreChunks } from '@/lib/embeddings';
+import { invalidateDocumentationCache } from '@/lib/doc-cache';
 
 export const maxDuration = 120; // 120 seconds for document processing
 
@@ -121,6 +122,8 @@ async function processContent({
 
   // Embed and store chunks
   await embedAndStoreChunks(chunks);
+  // Cached documentation was generated against the previous knowledge base (e.g. before new KPIs)
+  await invalidateDocumentationCache();
 
   return {
     success: true,
@@ -225,6 +228,7 @@ async function handleStreamingIngestion(input: { documents: Array<{ content: str
           })}\n\n`)
         );
       });
+      await invalidateDocumentationCache();
 
       // Send final result
       controller.enqueue(
@@ -1,10 +1,18 @@
 import { NextRequest, NextResponse } from 'next/server';
-import OpenAI from 'openai';
-import { safeJsonParse } from '@/lib/utils';
+import { getOpenAIClient } from '@/lib/openai-client';
+import { safeJsonParse, mapWithConcurrency, estimateTokens } from '@/lib/utils';
 import { searchKnowledgeBase } from '@/lib/pinecone';
+import { hashKey, getCachedDocumentation, setCachedDocumentation } from '@/lib/doc-cache';
+import { TopLevelSectionScanner } from '@/lib/partial-json';
+import {
+  DOCUMENTATION_RESPONSE_FORMAT,
+  maxDocumentationTokens,
+  maxPromptTokens,
+  parseDocumentation,
+} from '@/lib/documentation-schema';
 
 // Initialize client once (Edge runtime not supported -> Node)
-const openai = new OpenAI({ apiKey: process.env.OPENAI_API_KEY });
+const openai = getOpenAIClient();
 
 const encoder = new TextEncoder();
 
@@ -15,7 +23,7 @@ function sendSSE(controller: ReadableStreamDefaultController<Uint8Array>, obj: S
 }
 
 interface StreamChunk {
-  choices: { delta?: { content?: string } }[];
+  choices: { delta?: { content?: string }; finish_reason?: string | null }[];
 }
 
 interface KPISearchResult {
@@ -135,6 +143,15 @@ Additional Guidance:
 - IDENTIFY AND EXTRACT ALL KPIs, METRICS, AND CALCULATIONS FROM THE CODE. Look for aggregations, ratios, percentages, counts, sums, averages, and any business metrics being calculated.
 `;
 
+const SYSTEM_ROLE = 'You are a technical documentation expert specializing in Python code documentation for business audiences. You analyze all types of Python code including data pipelines, web APIs, FastAPI applications, Lambda functions, and business applications. Your task is to create comprehensive documentation that identifies and extracts ALL potential KPIs and metrics, even from infrastructure code. For API applications, focus on identifying metrics like request counts, response times, error rates, user interactions, and business outcomes. Always extract meaningful KPIs that business stakeholders would find valuable for monitoring, decision-making, and performance tracking.';
+
+// The template is static, so it lives in the system message: the prompt prefix stays identical
+// across requests (eligible for OpenAI prompt caching) and is only assembled once per process
+const SYSTEM_MESSAGE = {
+  role: 'system' as const,
+  content: `${SYSTEM_ROLE}\n\n${DOCUMENTATION_TEMPLATE}`,
+};
+
 // Function to extract KPI names from Python code
 async function extractKPINames(pythonCode: string): Promise<string[]> {
   const extractionPrompt = `You are a KPI extraction expert. Analyze the provided Python code and identify ALL potential KPI names, metrics, and business measures.
@@ -344,11 +361,12 @@ function extractKPIsFromCodePatterns(pythonCode: string): string[] {
   return kpis;
 }
 
+const KPI_SEARCH_CONCURRENCY = 5;
+
 // Function to search for specific KPI definitions in the vector database
 async function searchForKPIDefinitions(kpiNames: string[]): Promise<KPISearchResult[]> {
-  const kpiDefinitions: KPISearchResult[] = [];
-  
-  for (const kpiName of kpiNames) {
+  // Lookups are independent network calls, so run them concurrently (bounded to stay within rate limits)
+  const results = await mapWithConcurrency(kpiNames, KPI_SEARCH_CONCURRENCY, async (kpiName): Promise<KPISearchResult | null> => {
     try {
       // Search for each KPI name across all files
       const searchResult = await searchKnowledgeBase(
@@ -380,23 +398,41 @@ async function searchForKPIDefinitions(kpiNames: string[]): Promise<KPISearchRes
         });
         
         if (bestMatch) {
-          kpiDefinitions.push({
+          return {
             searchedKPI: kpiName,
             match: bestMatch,
             score: bestMatch.score || 0
-          });
+          };
         }
       }
     } catch (error) {
       console.error(`Error searching for KPI "${kpiName}":`, error);
     }
-  }
+    return null;
+  });
   
-  return kpiDefinitions;
+  return results.filter((result): result is KPISearchResult => result !== null);
 }
 
 export const maxDuration = 300; // Increase max duration to 5 minutes for large files
 
+const PROGRESS_INTERVAL_CHUNKS = 20;
+
+// Part of the cache key: bump whenever the prompt, template or response schema changes so
+// documentation generated under the old prompt is not served from the cache
+const DOCUMENTATION_CACHE_VERSION = 2;
+
+// Symbol-heavy Python runs closer to 3 characters per token than 4, so size the guard conservatively
+const PROMPT_CHARS_PER_TOKEN = 3;
+
+// Prompts that can't fit in the model's context would only fail after a slow round-trip
+function promptTooLargeResponse(tokens: number, limit: number) {
+  return NextResponse.json(
+    { error: `Input is too large to document (~${tokens} tokens, limit ${limit}). Please split the file and try again.` },
+    { status: 413 }
+  );
+}
+
 export async function POST(request: NextRequest) {
   try {
     const { pythonCode, filename, existingExcel, existingDocxSections } = await request.json();
@@ -409,6 +445,43 @@ export async function POST(request: NextRequest) {
       return NextResponse.json({ error: 'OpenAI API key not configured' }, { status: 500 });
     }
 
+    const model = process.env.OPENAI_MODEL || 'gpt-4o-mini';
+    const promptLimit = maxPromptTokens(model);
+
+    // Reject oversized inputs before the KPI extraction call; update mode includes the
+    // existing sections twice (as text and as JSON)
+    const countTokens = (text: string) => estimateTokens(text, PROMPT_CHARS_PER_TOKEN);
+    const systemTokens = countTokens(SYSTEM_MESSAGE.content);
+    const inputTokens =
+      systemTokens +
+      countTokens(pythonCode) +
+      (existingExcel ? countTokens(existingExcel) : 0) +
+      (existingDocxSections ? 2 * countTokens(JSON.stringify(existingDocxSections.sections)) : 0);
+    if (inputTokens > promptLimit) {
+      return promptTooLargeResponse(inputTokens, promptLimit);
+    }
+
+    // Identical inputs produce identical documentation, so skip the OpenAI round-trips on repeats
+    const cacheKey = hashKey(DOCUMENTATION_CACHE_VERSION, model, filename, pythonCode, existingExcel ?? null, existingDocxSections ?? null);
+    const cachedDoc = await getCachedDocumentation(cacheKey);
+    if (cachedDoc !== undefined) {
+      console.log('[openai-proxy] Cache hit, returning stored documentation');
+      const cachedStream = new ReadableStream<Uint8Array>({
+        start(controller) {
+          sendSSE(controller, { progress: 'Loaded documentation from cache' });
+          sendSSE(controller, { complete: true, documentation: cachedDoc });
+          controller.close();
+        },
+      });
+      return new NextResponse(cachedStream, {
+        headers: {
+          'Content-Type': 'text/event-stream; charset=utf-8',
+          'Cache-Control': 'no-cache, no-transform',
+          Connection: 'keep-alive',
+        },
+      });
+    }
+
     // Two-pass KPI approach: First extract KPI names, then search for their definitions
     console.log('[openai-proxy] Step 1: Extracting KPI names from code...');
     const extractedKPINames = await extractKPINames(pythonCode);
@@ -419,7 +492,7 @@ export async function POST(request: NextRequest) {
     console.log('[openai-proxy] Found KPI definitions:', kpiDefinitions.length);
 
     // Build user prompt with optional Excel content and existing DOCX sections
-    let userContent = `${DOCUMENTATION_TEMPLATE}\n\nPython file: ${filename}\n\nPython Code:\n\u0060\u0060\u0060python\n${pythonCode}\n\u0060\u0060\u0060`;
+    let userContent = `Python file: ${filename}\n\nPython Code:\n\u0060\u0060\u0060python\n${pythonCode}\n\u0060\u0060\u0060`;
     if (existingExcel) {
       userContent += `\n\nExisting Excel Data (CSV format of first sheet):\n\u0060\u0060\u0060csv\n${existingExcel}\n\u0060\u0060\u0060`;
     }
@@ -471,7 +544,13 @@ Only create new KPI definitions for metrics not found in the existing definition
       
       userContent += `\n\nPlease update and enhance the existing sections with information from the Python code. Preserve good content where appropriate and integrate new findings.`;
     } else {
-      userContent += `\n\nPlease generate the documentation following the exact template format provided above.`;
+      userContent += `\n\nPlease generate the documentation following the exact template format provided in the system instructions.`;
+    }
+
+    // Re-check the assembled prompt, which now includes the knowledge-base KPI definitions
+    const promptTokens = systemTokens + countTokens(userContent);
+    if (promptTokens > promptLimit) {
+      return promptTooLargeResponse(promptTokens, promptLimit);
     }
 
     const stream = new ReadableStream<Uint8Array>({
@@ -488,18 +567,19 @@ Only create new KPI definitions for metrics not found in the existing definition
         (async () => {
           let docString = '';
           let chunkCount = 0;
+          // Update mode returns a different shape, so only stream sections for fresh documentation
+          const sectionScanner = existingDocxSections ? null : new TopLevelSectionScanner();
           try {
             sendSSE(controller, { progress: 'Connecting to OpenAI...' });
             
             const completion = await openai.chat.completions.create({
-              model: process.env.OPENAI_MODEL || 'gpt-4o-mini',
-              response_format: { type: 'json_object' },
+              model,
+              // Update mode returns a different shape; fresh documentation is schema-constrained
+              response_format: existingDocxSections ? { type: 'json_object' } : DOCUMENTATION_RESPONSE_FORMAT,
+              max_completion_tokens: maxDocumentationTokens(model),
               stream: true,
               messages: [
-                {
-                  role: 'system',
-                  content: 'You are a technical documentation expert specializing in Python code documentation for business audiences. You analyze all types of Python code including data pipelines, web APIs, FastAPI applications, Lambda functions, and business applications. Your task is to create comprehensive documentation that identifies and extracts ALL potential KPIs and metrics, even from infrastructure code. For API applications, focus on identifying metrics like request counts, response times, error rates, user interactions, and business outcomes. Always extract meaningful KPIs that business stakeholders would find valuable for monitoring, decision-making, and performance tracking.',
-                },
+                SYSTEM_MESSAGE,
                 {
                   role: 'user',
                   content: userContent,
@@ -509,21 +589,25 @@ Only create new KPI definitions for metrics not found in the existing definition
 
             sendSSE(controller, { progress: 'Receiving response from OpenAI...' });
 
+            let finishReason: string | null | undefined;
             for await (const chunk of completion as AsyncIterable<StreamChunk>) {
+              finishReason = chunk.choices?.[0]?.finish_reason ?? finishReason;
               const delta = chunk.choices?.[0]?.delta?.content ?? '';
               if (delta) {
                 docString += delta;
                 chunkCount++;
                 
-                // Send very frequent progress updates to maintain connection
-                if (chunkCount % 5 === 0) {
+                // Progress frames keep the connection alive; each one also re-renders the
+                // client, so send them every PROGRESS_INTERVAL_CHUNKS rather than every few tokens
+                if (chunkCount % PROGRESS_INTERVAL_CHUNKS === 0) {
                   sendSSE(controller, { progress: `Processing... (${chunkCount} chunks)` });
                 }
                 
-                // Try to parse and send partial results more frequently
-                if (chunkCount % 50 === 0) {
-                  const partialDoc = safeJsonParse(docString);
-                  if (partialDoc !== undefined) {
+                // Send sections as soon as they close so the client can render them
+                // while the rest of the document is still being generated
+                if (sectionScanner && sectionScanner.push(delta)) {
+                  const partialDoc = sectionScanner.completedSections();
+                  if (partialDoc) {
                     sendSSE(controller, { partial: true, documentation: partialDoc });
                   }
                 }
@@ -533,8 +617,36 @@ Only create new KPI definitions for metrics not found in the existing definition
             clearInterval(keepAliveInterval);
             sendSSE(controller, { progress: 'Finalizing documentation...' });
             
-            const parsedDoc = safeJsonParse(docString);
+            // A response cut off at the token cap can't be valid JSON, so don't spend two full
+            // parse attempts (strict, then brace-trimmed) on a payload that may be tens of KB
+            if (finishReason === 'length') {
+              console.warn('[openai-proxy] Response truncated at', docString.length, 'characters');
+              sendSSE(controller, { error: 'Documentation exceeded the maximum response length' });
+              controller.close();
+              return;
+            }
+
+            // Fresh documentation is parsed and shape-checked in one step; update mode has its own shape
+            let parsedDoc: unknown;
+            if (existingDocxSections) {
+              parsedDoc = safeJsonParse(docString);
+            } else {
+              const result = parseDocumentation(docString);
+              // Well-formed JSON in the wrong shape is a separate failure from invalid JSON
+              if (result.status === 'shape_mismatch') {
+                console.warn(
+                  '[openai-proxy] Response JSON does not match the documentation template, top-level keys:',
+                  result.value && typeof result.value === 'object' ? Object.keys(result.value) : typeof result.value
+                );
+                sendSSE(controller, { error: 'Documentation response did not match the expected template' });
+                controller.close();
+                return;
+              }
+              parsedDoc = result.status === 'ok' ? result.documentation : undefined;
+            }
 
+            // Structured outputs guarantee valid JSON for complete responses; update mode still
+            // uses plain JSON mode, so keep the parse check for both cases
             if (parsedDoc === undefined) {
               console.warn('[openai-proxy] JSON parse failed, payload starts with', docString.slice(0, 120));
               sendSSE(controller, { error: 'Failed to parse documentation JSON' });
@@ -562,6 +674,8 @@ Only create new KPI definitions for metrics not found in the existing definition
             }
 
             sendSSE(controller, { complete: true, documentation: finalDoc });
+            // Persisting to disk is off the response path; failures are logged by the cache
+            void setCachedDocumentation(cacheKey, finalDoc);
             console.log('[openai-proxy] ✅ Documentation generation completed');
             controller.close();
           } catch (err: unknown) {
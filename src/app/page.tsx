@@ -1,6 +1,6 @@
 'use client';
 
-import React, { useState } from 'react';
+import React, { memo, useCallback, useRef, useState } from 'react';
 import { useDropzone } from 'react-dropzone';
 import { Upload, FileText, Download, CheckCircle, X, Heart, MessageSquare, TrendingUp } from 'lucide-react';
 import { saveAs } from 'file-saver';
@@ -47,22 +47,28 @@ interface Documentation {
   }[];
 }
 
-// Documentation Viewer Component using shadcn/ui
-const DocumentationViewer = ({ 
+// Documentation Viewer Component using shadcn/ui. Memoized so progress and status
+// updates in the page don't re-render the (potentially large) documentation tables.
+const DocumentationViewer = memo(function DocumentationViewer({ 
   documentation, 
   onDownload, 
+  onDownloadIntent,
   isDownloading,
   filename,
   onChatFeedback,
-  file
+  file,
+  isGenerating
 }: { 
   documentation: Documentation;
   onDownload: () => void;
+  onDownloadIntent: () => void;
   isDownloading: boolean;
   filename: string;
   onChatFeedback: (feedback: string) => void;
   file: File | null;
-}) => {
+  // True while sections are still streaming in; actions need the complete document
+  isGenerating: boolean;
+}) {
   const [isApproving, setIsApproving] = useState(false);
   const [hasApproved, setHasApproved] = useState(false);
   const [showChat, setShowChat] = useState(false);
@@ -112,13 +118,17 @@ const DocumentationViewer = ({
           <div>
             <CardTitle className="text-2xl">Generated Documentation</CardTitle>
             <CardDescription>
-              Comprehensive documentation generated from {filename}
+              {isGenerating
+                ? `Generating documentation from ${filename}... sections appear as they complete`
+                : `Comprehensive documentation generated from ${filename}`}
             </CardDescription>
           </div>
           <div className="flex gap-2">
             <Button 
               onClick={onDownload} 
-              disabled={isDownloading}
+              onMouseEnter={onDownloadIntent}
+              onFocus={onDownloadIntent}
+              disabled={isDownloading || isGenerating}
               className="min-w-[150px]"
             >
               {isDownloading ? (
@@ -135,7 +145,7 @@ const DocumentationViewer = ({
             </Button>
             <Button
               onClick={handleApprove}
-              disabled={isApproving || hasApproved}
+              disabled={isApproving || hasApproved || isGenerating}
               className="min-w-[150px]"
               variant={hasApproved ? "secondary" : "default"}
             >
@@ -152,6 +162,7 @@ const DocumentationViewer = ({
             </Button>
             <Button
               onClick={() => setShowChat(!showChat)}
+              disabled={isGenerating}
               variant="outline"
               className="min-w-[150px]"
             >
@@ -332,7 +343,7 @@ const DocumentationViewer = ({
       )}
 
       {/* Chat Interface */}
-      {showChat && (
+      {showChat && !isGenerating && (
         <Card>
           <CardHeader>
             <CardTitle>Chat & Feedback</CardTitle>
@@ -355,7 +366,41 @@ const DocumentationViewer = ({
       )}
     </div>
   );
-};
+});
+
+// Uploaded files don't change, so each one is read at most once (generation and feedback reuse it)
+const fileTextCache = new WeakMap<File, Promise<string>>();
+
+function readFileText(file: File): Promise<string> {
+  let text = fileTextCache.get(file);
+  if (!text) {
+    text = file.text();
+    fileTextCache.set(file, text);
+    text.catch(() => fileTextCache.delete(file));
+  }
+  return text;
+}
+
+// Builds the DOCX for a documentation object via the generate-docs route
+async function requestDocx(doc: Documentation, filename: string): Promise<Blob> {
+  const response = await fetch('/api/generate-docs', {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({
+      documentation: doc,
+      filename,
+      format: 'docx'
+    }),
+  });
+
+  if (!response.ok) {
+    throw new Error('Failed to download documentation');
+  }
+
+  return response.blob();
+}
 
 export default function Home() {
   const [file, setFile] = useState<File | null>(null); // Python file
@@ -368,7 +413,27 @@ export default function Home() {
   const [isDownloading, setIsDownloading] = useState(false);
   const [progressMessage, setProgressMessage] = useState<string>('');
 
-  const handleChatFeedback = async (feedback: string) => {
+  // DOCX for the current documentation, requested when the user hovers or focuses Download so the
+  // click usually finds it ready; generations that are never downloaded cost no DOCX build
+  const docxPrefetchRef = useRef<{ documentation: Documentation; filename: string; blob: Promise<Blob> } | null>(null);
+
+  const prefetchDocx = useCallback(() => {
+    // Wait for the final documentation; partial sections are still changing while streaming
+    if (!documentation || !file || isProcessing) return;
+
+    const current = docxPrefetchRef.current;
+    if (current && current.documentation === documentation && current.filename === file.name) return;
+
+    const blob = requestDocx(documentation, file.name);
+    const entry = { documentation, filename: file.name, blob };
+    docxPrefetchRef.current = entry;
+    // A failed prefetch is retried on click; don't leave an unhandled rejection behind
+    blob.catch(() => {
+      if (docxPrefetchRef.current === entry) docxPrefetchRef.current = null;
+    });
+  }, [documentation, file, isProcessing]);
+
+  const handleChatFeedback = useCallback(async (feedback: string) => {
     // Handle special chat commands
     if (feedback === 'DOCUMENTATION_UPDATED') {
       // This is a signal from the chat interface that documentation was updated
@@ -397,7 +462,7 @@ export default function Home() {
     
     try {
       // Read the file content
-      const fileContent = await file.text();
+      const fileContent = await readFileText(file);
       
       // Send feedback with current documentation for regeneration
       const response = await fetch('/api/agents/regenerate', {
@@ -424,7 +489,7 @@ export default function Home() {
       console.error('Feedback processing error:', error);
       setError('Failed to process feedback');
     }
-  };
+  }, [file, documentation]);
 
   const { getRootProps, getInputProps, isDragActive } = useDropzone({
     accept: { 
@@ -437,7 +502,11 @@ export default function Home() {
       const py = acceptedFiles.find((f) => f.name.endsWith('.py')) ?? null;
       const xl = acceptedFiles.find((f) => f.name.endsWith('.xlsx')) ?? null;
       const docx = acceptedFiles.find((f) => f.name.endsWith('.docx')) ?? null;
-      if (py) setFile(py);
+      if (py) {
+        setFile(py);
+        // Start reading now so the content is ready when Generate is clicked
+        readFileText(py);
+      }
       if (xl) setExcelFile(xl);
       if (docx) setWordFile(docx);
     },
@@ -453,7 +522,7 @@ export default function Home() {
     setProgressMessage('');
 
     try {
-      const fileContent = await file.text();
+      const fileContent = await readFileText(file);
       let excelCsv: string | null = null;
       if (excelFile) {
         const arrayBuffer = await excelFile.arrayBuffer();
@@ -518,6 +587,8 @@ export default function Home() {
       }
 
     } catch (err) {
+      // Drop any partially streamed sections
+      setDocumentation(null);
       setError(err instanceof Error ? err.message : 'An error occurred');
     } finally {
       setIsProcessing(false);
@@ -591,7 +662,7 @@ export default function Home() {
           continue;
         }
         
-        const msg = data as { error?: string; progress?: string; complete?: boolean; documentation?: Documentation };
+        const msg = data as { error?: string; progress?: string; partial?: boolean; complete?: boolean; documentation?: Documentation };
         
         if (msg.error) {
           throw new Error(msg.error);
@@ -601,6 +672,11 @@ export default function Home() {
           setProgressMessage(msg.progress);
         }
         
+        // Render completed sections while the rest is still streaming
+        if (msg.partial && msg.documentation) {
+          setDocumentation(msg.documentation);
+        }
+        
         if (msg.complete && msg.documentation) {
           documentationResult = msg.documentation;
         }
@@ -630,31 +706,26 @@ export default function Home() {
     // KPIs are only stored when user explicitly clicks "Store KPIs" button.
   };
 
-  const downloadDocumentation = async () => {
+  const downloadDocumentation = useCallback(async () => {
     if (!file || !documentation) return;
 
     setIsDownloading(true);
     setError('');
     
     try {
-      // Step 2: Generate DOCX from existing documentation
-      const response = await fetch('/api/generate-docs', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          documentation: documentation,
-          filename: file.name,
-          format: 'docx'
-        }),
-      });
-
-      if (!response.ok) {
-        throw new Error('Failed to download documentation');
+      // Step 2: Use the DOCX built in the background if it matches what's on screen
+      const prefetched = docxPrefetchRef.current;
+      let blob: Blob;
+      if (prefetched && prefetched.documentation === documentation && prefetched.filename === file.name) {
+        try {
+          blob = await prefetched.blob;
+        } catch {
+          // The background build failed after the click; retry with a fresh request
+          blob = await requestDocx(documentation, file.name);
+        }
+      } else {
+        blob = await requestDocx(documentation, file.name);
       }
-
-      const blob = await response.blob();
       const filename = `${file.name.replace('.py', '')}_documentation.docx`;
       saveAs(blob, filename);
       setSuccessMessage(`Documentation downloaded successfully as ${filename}`);
@@ -664,7 +735,7 @@ export default function Home() {
     } finally {
       setIsDownloading(false);
     }
-  };
+  }, [file, documentation]);
 
   return (
     <div className="min-h-screen bg-gradient-to-br from-blue-50 via-indigo-50 to-purple-50">
@@ -878,10 +949,12 @@ export default function Home() {
           <DocumentationViewer 
             documentation={documentation} 
             onDownload={downloadDocumentation} 
+            onDownloadIntent={prefetchDocx}
             isDownloading={isDownloading}
             filename={file.name}
             onChatFeedback={handleChatFeedback}
             file={file}
+            isGenerating={isProcessing}
           />
         )}
 
@@ -1,5 +1,6 @@
-import OpenAI from 'openai';
+import type OpenAI from 'openai';
 import { getRelevantContext } from '../embeddings';
+import { getOpenAIClient } from '../openai-client';
 
 // Agent communication message types
 export interface AgentMessage {
@@ -49,9 +50,7 @@ export abstract class BaseAgent {
 
   constructor(config: AgentConfig) {
     this.config = config;
-    this.openai = new OpenAI({
-      apiKey: process.env.OPENAI_API_KEY!,
-    });
+    this.openai = getOpenAIClient();
     this.context = {
       sessionId: '',
       taskId: '',
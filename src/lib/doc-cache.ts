@@ -0,0 +1,137 @@
+import { createHash } from 'crypto';
+import { promises as fs } from 'fs';
+import os from 'os';
+import path from 'path';
+
+// Cached documentation is reused for identical inputs for up to a day
+const CACHE_TTL_MS = 24 * 60 * 60 * 1000;
+
+interface CacheEntry {
+  value: unknown;
+  createdAt: number;
+}
+
+// Bounds for a long-running server; least recently used entries are evicted first
+const MAX_MEMORY_ENTRIES = 100;
+const MAX_DISK_ENTRIES = 500;
+
+// In-memory layer in front of the on-disk cache (per server instance)
+const memoryCache = new Map<string, CacheEntry>();
+
+// Serverless functions can only write to the temp directory
+function getCacheDir(): string {
+  return process.env.DOC_CACHE_DIR || path.join(os.tmpdir(), 'doc_cache');
+}
+
+function isFresh(entry: CacheEntry): boolean {
+  return Date.now() - entry.createdAt < CACHE_TTL_MS;
+}
+
+function rememberEntry(key: string, entry: CacheEntry): void {
+  // Re-insert so Map order tracks recency
+  memoryCache.delete(key);
+  memoryCache.set(key, entry);
+  if (memoryCache.size > MAX_MEMORY_ENTRIES) {
+    const oldestKey = memoryCache.keys().next().value;
+    if (oldestKey !== undefined) memoryCache.delete(oldestKey);
+  }
+}
+
+// Removes the least recently written files once the directory exceeds MAX_DISK_ENTRIES
+async function pruneDiskCache(dir: string): Promise<void> {
+  const files = (await fs.readdir(dir)).filter((file) => file.endsWith('.json'));
+  if (files.length <= MAX_DISK_ENTRIES) return;
+
+  const byAge = await Promise.all(
+    files.map(async (file) => ({ file, mtimeMs: (await fs.stat(path.join(dir, file))).mtimeMs }))
+  );
+  byAge.sort((a, b) => a.mtimeMs - b.mtimeMs);
+  await Promise.all(
+    byAge
+      .slice(0, files.length - MAX_DISK_ENTRIES)
+      .map(({ file }) => fs.rm(path.join(dir, file), { force: true }))
+  );
+}
+
+/**
+ * Builds a stable cache key from the request inputs (code, filename, model, ...).
+ */
+export function hashKey(...parts: unknown[]): string {
+  return createHash('sha256').update(JSON.stringify(parts)).digest('hex');
+}
+
+/**
+ * Hashes an already-serialized payload (e.g. a raw request body) without re-encoding it.
+ */
+export function hashText(text: string): string {
+  return createHash('sha256').update(text).digest('hex');
+}
+
+/**
+ * Returns the cached documentation for a key, checking memory first and then disk.
+ */
+export async function getCachedDocumentation(key: string): Promise<unknown | undefined> {
+  const cached = memoryCache.get(key);
+  if (cached) {
+    if (isFresh(cached)) {
+      rememberEntry(key, cached);
+      return cached.value;
+    }
+    memoryCache.delete(key);
+  }
+
+  const file = path.join(getCacheDir(), `${key}.json`);
+  try {
+    const raw = await fs.readFile(file, 'utf8');
+    const entry = JSON.parse(raw) as CacheEntry;
+    if (!isFresh(entry)) {
+      await fs.rm(file, { force: true });
+      return undefined;
+    }
+    rememberEntry(key, entry);
+    return entry.value;
+  } catch {
+    // Cache miss or unreadable entry
+    return undefined;
+  }
+}
+
+/**
+ * Stores documentation under a key in memory (synchronously) and on disk. Disk failures are
+ * non-fatal, so callers don't need to await the returned promise.
+ */
+export async function setCachedDocumentation(key: string, value: unknown): Promise<void> {
+  const entry: CacheEntry = { value, createdAt: Date.now() };
+  rememberEntry(key, entry);
+
+  try {
+    const dir = getCacheDir();
+    await fs.mkdir(dir, { recursive: true });
+    await fs.writeFile(path.join(dir, `${key}.json`), JSON.stringify(entry), 'utf8');
+    await pruneDiskCache(dir);
+  } catch (error) {
+    console.warn('[doc-cache] Failed to persist cache entry:', error);
+  }
+}
+
+export function clearDocumentationCache(): void {
+  memoryCache.clear();
+}
+
+/**
+ * Drops every cached entry in memory and on disk. Generated documentation reuses the KPI
+ * definitions stored in the knowledge base, so this runs whenever the knowledge base changes.
+ */
+export async function invalidateDocumentationCache(): Promise<void> {
+  memoryCache.clear();
+
+  const dir = getCacheDir();
+  try {
+    const files = await fs.readdir(dir).catch(() => [] as string[]);
+    await Promise.all(
+      files.filter((file) => file.endsWith('.json')).map((file) => fs.rm(path.join(dir, file), { force: true }))
+    );
+  } catch (error) {
+    console.warn('[doc-cache] Failed to clear cache directory:', error);
+  }
+}
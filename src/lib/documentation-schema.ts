@@ -0,0 +1,141 @@
+import type { ResponseFormatJSONSchema } from 'openai/resources/shared';
+import type { Documentation } from './docx-util';
+import { safeJsonParse } from './utils';
+
+/**
+ * Upper bound on generated tokens for one documentation response, sized to the model's output
+ * limit. Reasoning models (o-series, gpt-5) count their reasoning tokens against this cap too,
+ * so they get their full 100K budget; long multi-table documents would otherwise be cut off.
+ */
+export function maxDocumentationTokens(model: string): number {
+  if (/^(o\d|gpt-5)/.test(model)) return 100000;
+  if (model.startsWith('gpt-4.1')) return 32000;
+  return 16000;
+}
+
+function contextWindowTokens(model: string): number {
+  if (model.startsWith('gpt-4.1')) return 1000000;
+  if (model.startsWith('gpt-5')) return 400000;
+  if (/^o\d/.test(model)) return 200000;
+  return 128000;
+}
+
+/**
+ * Largest prompt (system + user messages) that still leaves the model its full
+ * documentation budget within the context window.
+ */
+export function maxPromptTokens(model: string): number {
+  return contextWindowTokens(model) - maxDocumentationTokens(model);
+}
+
+const stringArray = { type: 'array', items: { type: 'string' } };
+
+function strictObject(properties: Record<string, unknown>) {
+  return {
+    type: 'object',
+    properties,
+    required: Object.keys(properties),
+    additionalProperties: false,
+  };
+}
+
+/**
+ * JSON Schema for the documentation template (see `Documentation` in docx-util), used with
+ * OpenAI Structured Outputs so the model can only emit the expected shape.
+ */
+export const DOCUMENTATION_JSON_SCHEMA = strictObject({
+  description: { type: 'string' },
+  tableGrain: { type: 'string' },
+  dataSources: stringArray,
+  databricksTables: {
+    type: 'array',
+    items: strictObject({
+      tableName: { type: 'string' },
+      description: { type: 'string' },
+    }),
+  },
+  tableMetadata: {
+    type: 'array',
+    items: strictObject({
+      tableName: { type: 'string' },
+      columns: {
+        type: 'array',
+        items: strictObject({
+          columnName: { type: 'string' },
+          dataType: { type: 'string' },
+          description: { type: 'string' },
+          sampleValues: { type: 'string' },
+          sourceTable: { type: 'string' },
+          sourceColumn: { type: 'string' },
+        }),
+      },
+    }),
+  },
+  integratedRules: stringArray,
+  kpis: {
+    type: 'array',
+    items: strictObject({
+      name: { type: 'string' },
+      definition: { type: 'string' },
+      calculationLogic: { type: 'string' },
+      businessPurpose: { type: 'string' },
+      dataSource: { type: 'string' },
+      frequency: { type: 'string' },
+      owner: { type: 'string' },
+      tags: stringArray,
+    }),
+  },
+});
+
+export const DOCUMENTATION_RESPONSE_FORMAT: ResponseFormatJSONSchema = {
+  type: 'json_schema',
+  json_schema: {
+    name: 'python_documentation',
+    strict: true,
+    schema: DOCUMENTATION_JSON_SCHEMA,
+  },
+};
+
+function isObject(value: unknown): value is Record<string, unknown> {
+  return typeof value === 'object' && value !== null && !Array.isArray(value);
+}
+
+function isStringArray(value: unknown): value is string[] {
+  return Array.isArray(value) && value.every((item) => typeof item === 'string');
+}
+
+/**
+ * Checks that a parsed value has the documentation shape the viewer and DOCX builder rely on.
+ */
+export function isDocumentation(value: unknown): value is Documentation {
+  if (!isObject(value)) return false;
+  return (
+    typeof value.description === 'string' &&
+    typeof value.tableGrain === 'string' &&
+    isStringArray(value.dataSources) &&
+    Array.isArray(value.databricksTables) &&
+    value.databricksTables.every(isObject) &&
+    Array.isArray(value.tableMetadata) &&
+    value.tableMetadata.every((table) => isObject(table) && Array.isArray(table.columns)) &&
+    isStringArray(value.integratedRules) &&
+    (value.kpis === undefined ||
+      (Array.isArray(value.kpis) && value.kpis.every((kpi) => isObject(kpi) && isStringArray(kpi.tags))))
+  );
+}
+
+export type DocumentationParseResult =
+  | { status: 'ok'; documentation: Documentation }
+  | { status: 'invalid_json' }
+  | { status: 'shape_mismatch'; value: unknown };
+
+/**
+ * Parses a model response straight into typed documentation, telling apart text that is not
+ * valid JSON from well-formed JSON that does not match the template.
+ */
+export function parseDocumentation(raw: string): DocumentationParseResult {
+  const parsed = safeJsonParse(raw);
+  if (parsed === undefined) return { status: 'invalid_json' };
+  return isDocumentation(parsed)
+    ? { status: 'ok', documentation: parsed }
+    : { status: 'shape_mismatch', value: parsed };
+}
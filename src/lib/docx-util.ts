@@ -53,84 +53,113 @@ export interface ExtractedSections {
 }
 
 
+// Shared styling, built once at module load instead of on every header/paragraph/bullet
+// (font sizes are in half-points)
+const TITLE_SIZE = 36;
+const SUBTITLE_SIZE = 24;
+const SECTION_HEADER_SIZE = 28;
+const SUB_HEADER_SIZE = 24;
+const BODY_TEXT_SIZE = 22;
+const SECTION_HEADER_SPACING = { before: 600, after: 300 };
+const SECTION_HEADER_BORDER = { bottom: { color: '1B5E20', size: 4, space: 1, style: BorderStyle.SINGLE } };
+const SUB_HEADER_SPACING = { before: 400, after: 200 };
+const PARAGRAPH_SPACING = { after: 150, before: 50 };
+const BULLET_SPACING = { after: 120, before: 60 };
+const BULLET_INDENT = { left: convertInchesToTwip(0.25) };
+const BULLET_LEVEL = { level: 0 };
+const TABLE_BORDERS = {
+  top: { style: BorderStyle.SINGLE, size: 6, color: 'CCCCCC' },
+  bottom: { style: BorderStyle.SINGLE, size: 6, color: 'CCCCCC' },
+  left: { style: BorderStyle.SINGLE, size: 4, color: 'CCCCCC' },
+  right: { style: BorderStyle.SINGLE, size: 4, color: 'CCCCCC' },
+  insideHorizontal: { style: BorderStyle.SINGLE, size: 2, color: 'CCCCCC' },
+  insideVertical: { style: BorderStyle.SINGLE, size: 2, color: 'CCCCCC' },
+};
+const FULL_WIDTH = { size: 100, type: WidthType.PERCENTAGE };
+const TABLE_TEXT_SIZE = 20;
+const HEADER_CELL_MARGINS = { top: 200, bottom: 200, left: 200, right: 200 };
+const DATA_CELL_MARGINS = { top: 150, bottom: 150, left: 200, right: 200 };
+const HEADER_SHADING = { fill: 'FFFFFF' };
+const EVEN_ROW_SHADING = { fill: 'F7F7F7' };
+const ODD_ROW_SHADING = { fill: 'FFFFFF' };
+
+// Document-level pieces that are identical for every report
+const TITLE_SPACING = { after: 400 };
+const SUBTITLE_SPACING = { after: 600 };
+const DIVIDER_BORDER = { bottom: { color: '2E86AB', space: 1, style: BorderStyle.SINGLE, size: 6 } };
+const PAGE_MARGIN = convertInchesToTwip(1);
+const PAGE_PROPERTIES = {
+  page: {
+    margin: { top: PAGE_MARGIN, right: PAGE_MARGIN, bottom: PAGE_MARGIN, left: PAGE_MARGIN },
+  },
+};
+const DATABRICKS_TABLE_HEADER = ['Table Name', 'Description'];
+const METADATA_TABLE_HEADER = ['Column Name', 'Data Type', 'Description', 'Sample Values', 'Source Table', 'Source Column'];
+
 function createSectionHeader(text: string): Paragraph {
   return new Paragraph({
-    children: [new TextRun({ text, bold: true, size: 28, color: '1B5E20' })],
+    children: [new TextRun({ text, bold: true, size: SECTION_HEADER_SIZE, color: '1B5E20' })],
     heading: HeadingLevel.HEADING_1,
-    spacing: { before: 600, after: 300 },
-    border: { bottom: { color: '1B5E20', size: 4, space: 1, style: BorderStyle.SINGLE } },
+    spacing: SECTION_HEADER_SPACING,
+    border: SECTION_HEADER_BORDER,
   });
 }
 function _createSubHeader(text: string): Paragraph {
   return new Paragraph({
-    children: [new TextRun({ text, bold: true, size: 24, color: '2E7D32' })],
+    children: [new TextRun({ text, bold: true, size: SUB_HEADER_SIZE, color: '2E7D32' })],
     heading: HeadingLevel.HEADING_2,
-    spacing: { before: 400, after: 200 },
+    spacing: SUB_HEADER_SPACING,
   });
 }
 function createParagraph(text: string): Paragraph {
   if (!text || text.trim() === '') return new Paragraph({ text: ' ' });
   return new Paragraph({
-    children: [new TextRun({ text: text.trim(), size: 22, color: '212121' })],
-    spacing: { after: 150, before: 50 },
+    children: [new TextRun({ text: text.trim(), size: BODY_TEXT_SIZE, color: '212121' })],
+    spacing: PARAGRAPH_SPACING,
     alignment: AlignmentType.JUSTIFIED,
   });
 }
 function createBullet(text: string): Paragraph {
   return new Paragraph({
-    children: [new TextRun({ text: text || '', size: 22, color: '424242' })],
-    bullet: { level: 0 },
-    spacing: { after: 120, before: 60 },
-    indent: { left: convertInchesToTwip(0.25) },
+    children: [new TextRun({ text: text || '', size: BODY_TEXT_SIZE, color: '424242' })],
+    bullet: BULLET_LEVEL,
+    spacing: BULLET_SPACING,
+    indent: BULLET_INDENT,
+  });
+}
+function createTableCell(
+  text: string,
+  width: { size: number; type: typeof WidthType.PERCENTAGE },
+  header: boolean,
+  shading: { fill: string }
+): TableCell {
+  return new TableCell({
+    children: [
+      new Paragraph({
+        children: [new TextRun({ text: (text || '').trim(), bold: header || undefined, color: '2C2C2C', size: TABLE_TEXT_SIZE })],
+        alignment: header ? AlignmentType.CENTER : AlignmentType.LEFT,
+      }),
+    ],
+    shading,
+    margins: header ? HEADER_CELL_MARGINS : DATA_CELL_MARGINS,
+    width,
   });
 }
 function createStyledTable(rows: string[][]) {
   if (rows.length === 0) return new Paragraph({ text: '' });
-  const [headerRow, ...dataRows] = rows;
+  // Every cell in a table shares one width object, computed once per table
+  const width = { size: 100 / rows[0].length, type: WidthType.PERCENTAGE };
+  const tableRows: TableRow[] = new Array(rows.length);
+  tableRows[0] = new TableRow({ children: rows[0].map((cell) => createTableCell(cell, width, true, HEADER_SHADING)) });
+  for (let i = 1; i < rows.length; i++) {
+    // Data rows alternate shading, starting with the shaded fill
+    const shading = i % 2 === 1 ? EVEN_ROW_SHADING : ODD_ROW_SHADING;
+    tableRows[i] = new TableRow({ children: rows[i].map((cell) => createTableCell(cell, width, false, shading)) });
+  }
   return new Table({
-    rows: [
-      new TableRow({
-        children: headerRow.map((cell) =>
-          new TableCell({
-            children: [
-              new Paragraph({
-                children: [new TextRun({ text: (cell || '').trim(), bold: true, color: '2C2C2C', size: 20 })],
-                alignment: AlignmentType.CENTER,
-              }),
-            ],
-            shading: { fill: 'FFFFFF' },
-            margins: { top: 200, bottom: 200, left: 200, right: 200 },
-            width: { size: 100 / headerRow.length, type: WidthType.PERCENTAGE },
-          })
-        ),
-      }),
-      ...dataRows.map((row, idx) =>
-        new TableRow({
-          children: row.map((cell) =>
-            new TableCell({
-              children: [
-                new Paragraph({
-                  children: [new TextRun({ text: (cell || '').trim(), size: 20, color: '2C2C2C' })],
-                  alignment: AlignmentType.LEFT,
-                }),
-              ],
-              shading: { fill: idx % 2 === 0 ? 'F7F7F7' : 'FFFFFF' },
-              margins: { top: 150, bottom: 150, left: 200, right: 200 },
-              width: { size: 100 / headerRow.length, type: WidthType.PERCENTAGE },
-            })
-          ),
-        })
-      ),
-    ],
-    borders: {
-      top: { style: BorderStyle.SINGLE, size: 6, color: 'CCCCCC' },
-      bottom: { style: BorderStyle.SINGLE, size: 6, color: 'CCCCCC' },
-      left: { style: BorderStyle.SINGLE, size: 4, color: 'CCCCCC' },
-      right: { style: BorderStyle.SINGLE, size: 4, color: 'CCCCCC' },
-      insideHorizontal: { style: BorderStyle.SINGLE, size: 2, color: 'CCCCCC' },
-      insideVertical: { style: BorderStyle.SINGLE, size: 2, color: 'CCCCCC' },
-    },
-    width: { size: 100, type: WidthType.PERCENTAGE },
+    rows: tableRows,
+    borders: TABLE_BORDERS,
+    width: FULL_WIDTH,
   });
 }
 
@@ -139,23 +168,23 @@ export function createDocxFromDocumentation(doc: Documentation, filename: string
 
   children.push(
     new Paragraph({
-      children: [new TextRun({ text: 'Python Documentation Report', bold: true, size: 36, color: '2E86AB' })],
+      children: [new TextRun({ text: 'Python Documentation Report', bold: true, size: TITLE_SIZE, color: '2E86AB' })],
       alignment: AlignmentType.CENTER,
-      spacing: { after: 400 },
+      spacing: TITLE_SPACING,
     })
   );
   children.push(
     new Paragraph({
-      children: [new TextRun({ text: `Generated for: ${filename}`, size: 24, color: '666666', italics: true })],
+      children: [new TextRun({ text: `Generated for: ${filename}`, size: SUBTITLE_SIZE, color: '666666', italics: true })],
       alignment: AlignmentType.CENTER,
-      spacing: { after: 600 },
+      spacing: SUBTITLE_SPACING,
     })
   );
   children.push(
     new Paragraph({
       children: [new TextRun({ text: '', size: 1 })],
-      border: { bottom: { color: '2E86AB', space: 1, style: BorderStyle.SINGLE, size: 6 } },
-      spacing: { after: 400 },
+      border: DIVIDER_BORDER,
+      spacing: TITLE_SPACING,
     })
   );
 
@@ -166,14 +195,14 @@ export function createDocxFromDocumentation(doc: Documentation, filename: string
   children.push(createParagraph(doc.tableGrain));
 
   children.push(createSectionHeader('3. Data Sources'));
-  if (doc.dataSources?.length) doc.dataSources.forEach((s) => children.push(createBullet(s)));
+  if (doc.dataSources?.length) children.push(...doc.dataSources.map((s) => createBullet(s)));
   else children.push(createParagraph('No data sources identified.'));
 
   children.push(createSectionHeader('4. Databricks Tables (Output)'));
   if (doc.databricksTables?.length) {
     children.push(
       createStyledTable([
-        ['Table Name', 'Description'],
+        DATABRICKS_TABLE_HEADER,
         ...doc.databricksTables.map((t) => [t.tableName, t.description]),
       ])
     );
@@ -185,7 +214,7 @@ export function createDocxFromDocumentation(doc: Documentation, filename: string
       children.push(_createSubHeader(`Table: ${tbl.tableName}`));
       children.push(
         createStyledTable([
-          ['Column Name', 'Data Type', 'Description', 'Sample Values', 'Source Table', 'Source Column'],
+          METADATA_TABLE_HEADER,
           ...tbl.columns.map((c) => [
             c.columnName,
             c.dataType,
@@ -200,7 +229,7 @@ export function createDocxFromDocumentation(doc: Documentation, filename: string
   } else children.push(createParagraph('No table metadata provided.'));
 
   children.push(createSectionHeader('6. Integrated Rules'));
-  if (doc.integratedRules?.length) doc.integratedRules.forEach((r) => children.push(createBullet(r)));
+  if (doc.integratedRules?.length) children.push(...doc.integratedRules.map((r) => createBullet(r)));
   else children.push(createParagraph('No rules described.'));
 
   // 7. KPIs Section
@@ -231,55 +260,13 @@ export function createDocxFromDocumentation(doc: Documentation, filename: string
   return new Document({
     sections: [
       {
-        properties: {
-          page: {
-            margin: {
-              top: convertInchesToTwip(1),
-              right: convertInchesToTwip(1),
-              bottom: convertInchesToTwip(1),
-              left: convertInchesToTwip(1),
-            },
-          },
-        },
+        properties: PAGE_PROPERTIES,
         children,
       },
     ],
   });
 }
 
-/**
- * Extracts plain text from HTML, removing all styling and formatting
- * to minimize token count for LLM processing
- */
-export function stripHtmlAndStyles(html: string): string {
-  // Remove HTML tags
-  const textWithoutTags = html.replace(/<[^>]*>/g, '');
-  
-  // Decode HTML entities
-  const htmlEntities: Record<string, string> = {
-    '&amp;': '&',
-    '&lt;': '<',
-    '&gt;': '>',
-    '&quot;': '"',
-    '&#39;': "'",
-    '&nbsp;': ' ',
-    '&ndash;': '–',
-    '&mdash;': '—',
-    '&ldquo;': '"',
-    '&rdquo;': '"',
-    '&lsquo;': "'",
-    '&rsquo;': "'",
-  };
-  
-  let decodedText = textWithoutTags;
-  for (const [entity, replacement] of Object.entries(htmlEntities)) {
-    decodedText = decodedText.replace(new RegExp(entity, 'g'), replacement);
-  }
-  
-  // Replace multiple whitespace with single space and trim
-  return decodedText.replace(/\s+/g, ' ').trim();
-}
-
 /**
  * Extracts sections from a DOCX file based on canonical headers
  * @param docxBuffer ArrayBuffer containing the DOCX file data
@@ -287,12 +274,11 @@ export function stripHtmlAndStyles(html: string): string {
  */
 export async function extractSections(docxBuffer: ArrayBuffer): Promise<ExtractedSections> {
   try {
-    // Convert DOCX to HTML using mammoth
-    const result = await mammoth.convertToHtml({ arrayBuffer: docxBuffer });
-    const html = result.value;
-    
-    // Extract raw text (stripped of HTML and styles)
-    const rawText = stripHtmlAndStyles(html);
+    // Read the plain text directly; no HTML or style conversion is needed for section lookup
+    const result = await mammoth.extractRawText({ arrayBuffer: docxBuffer });
+
+    // Collapse whitespace to minimize token count
+    const rawText = result.value.replace(/\s+/g, ' ').trim();
     
     // Define the canonical headers to look for
     const headerPatterns = {
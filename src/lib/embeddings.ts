@@ -1,11 +1,10 @@
-import OpenAI from 'openai';
 import { DocumentChunk } from './chunking';
 import { upsertVector, searchVectors } from './pinecone';
+import { getOpenAIClient } from './openai-client';
+import { estimateTokens } from './utils';
 
-// Initialize OpenAI client
-const openai = new OpenAI({
-  apiKey: process.env.OPENAI_API_KEY!,
-});
+// Shared OpenAI client
+const openai = getOpenAIClient();
 
 // Embedding model configuration
 const EMBEDDING_MODEL = 'text-embedding-3-large';
@@ -101,23 +100,33 @@ export async function searchSimilarContent(
 ): Promise<Array<{ id: string; score: number; content: string; source: string; metadata?: Record<string, unknown> }>> {
   try {
     const queryEmbedding = await generateEmbedding(query);
-    const indexName = getIndexForChunkType(type);
-    
-    const results = await searchVectors(indexName, queryEmbedding, topK, filter);
-    
-    return results.map(result => ({
-      id: result.id || '',
-      score: result.score || 0,
-      content: (result.metadata?.content as string) || '',
-      source: (result.metadata?.source as string) || '',
-      metadata: result.metadata as Record<string, unknown>
-    }));
+    return await searchByEmbedding(queryEmbedding, type, topK, filter);
   } catch (error) {
     console.error('Error searching similar content:', error);
     throw error;
   }
 }
 
+// Search with an already-computed query embedding
+async function searchByEmbedding(
+  queryEmbedding: number[],
+  type: 'document' | 'code' | 'qa' | 'kpi',
+  topK: number,
+  filter?: Record<string, unknown>
+): Promise<Array<{ id: string; score: number; content: string; source: string; metadata?: Record<string, unknown> }>> {
+  const indexName = getIndexForChunkType(type);
+  
+  const results = await searchVectors(indexName, queryEmbedding, topK, filter);
+  
+  return results.map(result => ({
+    id: result.id || '',
+    score: result.score || 0,
+    content: (result.metadata?.content as string) || '',
+    source: (result.metadata?.source as string) || '',
+    metadata: result.metadata as Record<string, unknown>
+  }));
+}
+
 // Hybrid search combining multiple content types
 export async function hybridSearch(
   query: string,
@@ -148,23 +157,26 @@ export async function hybridSearch(
   const searchPromises: Promise<Array<{ id: string; score: number; content: string; source: string; metadata?: Record<string, unknown> }>>[] = [];
   const types: string[] = [];
   
+  // Every content type is searched with the same query, so embed it once and share the vector
+  const queryEmbedding = await generateEmbedding(query);
+  
   if (includeDocuments) {
-    searchPromises.push(searchSimilarContent(query, 'document', topK, filter));
+    searchPromises.push(searchByEmbedding(queryEmbedding, 'document', topK, filter));
     types.push('document');
   }
   
   if (includeCode) {
-    searchPromises.push(searchSimilarContent(query, 'code', topK, filter));
+    searchPromises.push(searchByEmbedding(queryEmbedding, 'code', topK, filter));
     types.push('code');
   }
   
   if (includeQA) {
-    searchPromises.push(searchSimilarContent(query, 'qa', topK, filter));
+    searchPromises.push(searchByEmbedding(queryEmbedding, 'qa', topK, filter));
     types.push('qa');
   }
   
   if (includeKPIs) {
-    searchPromises.push(searchSimilarContent(query, 'kpi', topK, filter));
+    searchPromises.push(searchByEmbedding(queryEmbedding, 'kpi', topK, filter));
     types.push('kpi');
   }
   
@@ -224,7 +236,7 @@ export async function getRelevantContext(
   
   for (const result of relevantResults) {
     const content = result.content;
-    const estimatedContentTokens = Math.ceil(content.length / 4); // Rough token estimation
+    const estimatedContentTokens = estimateTokens(content);
     
     if (estimatedTokens + estimatedContentTokens > maxTokens) {
       break;
@@ -0,0 +1,16 @@
+import OpenAI from 'openai';
+
+let client: OpenAI | null = null;
+
+/**
+ * Returns the process-wide OpenAI client. Routes, agents and embeddings share it so the
+ * client (and its configuration) is built once rather than per module or per agent instance.
+ */
+export function getOpenAIClient(): OpenAI {
+  if (!client) {
+    // No custom httpAgent: openai-node already routes every request through its shared
+    // keep-alive agent, which also expires idle sockets before the server drops them
+    client = new OpenAI({ apiKey: process.env.OPENAI_API_KEY });
+  }
+  return client;
+}
@@ -0,0 +1,64 @@
+/**
+ * Incrementally scans a streamed JSON object and records where the last
+ * complete top-level property ends, so finished sections can be parsed and
+ * shown before the rest of the document has arrived. The final property is
+ * never reported: once the object closes the caller has the whole document.
+ *
+ * Each character is scanned once; parsing only happens when a new top-level
+ * property has closed.
+ */
+export class TopLevelSectionScanner {
+  private buffer = '';
+  private position = 0;
+  private depth = 0;
+  private inString = false;
+  private escaped = false;
+  private lastBoundary = -1;
+
+  /**
+   * Appends a streamed chunk. Returns true if at least one more top-level
+   * property was completed by this chunk.
+   */
+  push(chunk: string): boolean {
+    this.buffer += chunk;
+    const previousBoundary = this.lastBoundary;
+
+    for (; this.position < this.buffer.length; this.position++) {
+      const ch = this.buffer[this.position];
+
+      if (this.inString) {
+        if (this.escaped) this.escaped = false;
+        else if (ch === '\\') this.escaped = true;
+        else if (ch === '"') this.inString = false;
+        continue;
+      }
+
+      if (ch === '"') {
+        this.inString = true;
+      } else if (ch === '{' || ch === '[') {
+        this.depth++;
+      } else if (ch === '}' || ch === ']') {
+        this.depth--;
+      } else if (ch === ',' && this.depth === 1) {
+        this.lastBoundary = this.position;
+      }
+    }
+
+    return this.lastBoundary !== previousBoundary;
+  }
+
+  /**
+   * Parses the top-level properties that have fully arrived so far.
+   */
+  completedSections(): Record<string, unknown> | undefined {
+    if (this.lastBoundary < 0) return undefined;
+    try {
+      const parsed = JSON.parse(`${this.buffer.slice(0, this.lastBoundary)}}`);
+      return parsed && typeof parsed === 'object' && !Array.isArray(parsed)
+        ? (parsed as Record<string, unknown>)
+        : undefined;
+    } catch {
+      return undefined;
+    }
+  }
+}
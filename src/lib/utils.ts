@@ -27,6 +27,37 @@ export function safeJsonParse(str: string): unknown | undefined {
   }
 }
 
+/**
+ * Rough token count for prompt sizing (~4 characters per token for English text). Pass a smaller
+ * `charsPerToken` where overestimating is safer, e.g. for symbol-heavy code.
+ */
+export function estimateTokens(text: string, charsPerToken = 4): number {
+  return Math.ceil(text.length / charsPerToken);
+}
+
+/**
+ * Maps items through an async function with at most `limit` calls in flight.
+ * Results are returned in input order.
+ */
+export async function mapWithConcurrency<T, R>(
+  items: T[],
+  limit: number,
+  fn: (item: T, index: number) => Promise<R>
+): Promise<R[]> {
+  const results = new Array<R>(items.length);
+  let next = 0;
+
+  const worker = async () => {
+    while (next < items.length) {
+      const index = next++;
+      results[index] = await fn(items[index], index);
+    }
+  };
+
+  await Promise.all(Array.from({ length: Math.min(Math.max(limit, 1), items.length) }, worker));
+  return results;
+}
+
 /**
  * Async generator that yields parsed JSON objects from an SSE Response.
  * Usage:  for await (const obj of decodeSSE(resp)) {...}
@@ -0,0 +1,100 @@
+import { describe, it, expect, beforeEach, afterAll } from 'vitest';
+import { promises as fs } from 'fs';
+import os from 'os';
+import path from 'path';
+import {
+  hashKey,
+  hashText,
+  getCachedDocumentation,
+  setCachedDocumentation,
+  clearDocumentationCache,
+  invalidateDocumentationCache
+} from '@/lib/doc-cache';
+
+const cacheDir = path.join(os.tmpdir(), `doc_cache_test_${process.pid}`);
+
+describe('doc-cache', () => {
+  beforeEach(() => {
+    process.env.DOC_CACHE_DIR = cacheDir;
+    clearDocumentationCache();
+  });
+
+  afterAll(async () => {
+    delete process.env.DOC_CACHE_DIR;
+    await fs.rm(cacheDir, { recursive: true, force: true });
+  });
+
+  describe('hashKey', () => {
+    it('should produce the same key for the same inputs', () => {
+      expect(hashKey('gpt-4o-mini', 'etl.py', 'print(1)')).toBe(hashKey('gpt-4o-mini', 'etl.py', 'print(1)'));
+    });
+
+    it('should produce different keys when any input changes', () => {
+      const base = hashKey('gpt-4o-mini', 'etl.py', 'print(1)');
+      expect(hashKey('o3-2025-04-16', 'etl.py', 'print(1)')).not.toBe(base);
+      expect(hashKey('gpt-4o-mini', 'other.py', 'print(1)')).not.toBe(base);
+      expect(hashKey('gpt-4o-mini', 'etl.py', 'print(2)')).not.toBe(base);
+    });
+  });
+
+  describe('hashText', () => {
+    it('should hash the text as-is', () => {
+      expect(hashText('{"a":1}')).toBe(hashText('{"a":1}'));
+      expect(hashText('{"a":1}')).not.toBe(hashText('{"a": 1}'));
+    });
+  });
+
+  describe('getCachedDocumentation', () => {
+    it('should return undefined on a cache miss', async () => {
+      expect(await getCachedDocumentation(hashKey('missing'))).toBeUndefined();
+    });
+
+    it('should return stored documentation', async () => {
+      const key = hashKey('stored');
+      const doc = { description: 'Cached description', dataSources: ['raw.orders'] };
+
+      await setCachedDocumentation(key, doc);
+
+      expect(await getCachedDocumentation(key)).toEqual(doc);
+    });
+
+    it('should read entries persisted to disk after the memory cache is cleared', async () => {
+      const key = hashKey('persisted');
+      await setCachedDocumentation(key, { description: 'From disk' });
+
+      clearDocumentationCache();
+
+      expect(await getCachedDocumentation(key)).toEqual({ description: 'From disk' });
+    });
+
+    it('should drop persisted entries when the cache is invalidated', async () => {
+      const key = hashKey('invalidated');
+      await setCachedDocumentation(key, { description: 'Before KPI ingest' });
+
+      await invalidateDocumentationCache();
+
+      expect(await getCachedDocumentation(key)).toBeUndefined();
+    });
+
+    it('should ignore expired entries', async () => {
+      const key = hashKey('expired');
+      await fs.mkdir(cacheDir, { recursive: true });
+      await fs.writeFile(
+        path.join(cacheDir, `${key}.json`),
+        JSON.stringify({ value: { description: 'Stale' }, createdAt: 0 }),
+        'utf8'
+      );
+
+      expect(await getCachedDocumentation(key)).toBeUndefined();
+      await expect(fs.access(path.join(cacheDir, `${key}.json`))).rejects.toThrow();
+    });
+
+    it('should serve entries from memory before the disk write finishes', async () => {
+      const key = hashKey('unawaited');
+      const pending = setCachedDocumentation(key, { description: 'Immediate' });
+
+      expect(await getCachedDocumentation(key)).toEqual({ description: 'Immediate' });
+      await pending;
+    });
+  });
+});
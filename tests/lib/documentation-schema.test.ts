@@ -0,0 +1,101 @@
+import { describe, it, expect } from 'vitest';
+import {
+  DOCUMENTATION_JSON_SCHEMA,
+  isDocumentation,
+  maxDocumentationTokens,
+  maxPromptTokens,
+  parseDocumentation
+} from '@/lib/documentation-schema';
+
+const validDoc = {
+  description: 'Aggregates daily sales',
+  tableGrain: 'order_id',
+  dataSources: ['raw.orders'],
+  databricksTables: [{ tableName: 'analytics.sales', description: 'Daily sales' }],
+  tableMetadata: [
+    {
+      tableName: 'analytics.sales',
+      columns: [
+        {
+          columnName: 'order_id',
+          dataType: 'string',
+          description: 'Order identifier',
+          sampleValues: 'A-1',
+          sourceTable: 'raw.orders',
+          sourceColumn: 'id'
+        }
+      ]
+    }
+  ],
+  integratedRules: ['Exclude cancelled orders'],
+  kpis: [
+    {
+      name: 'Total Revenue',
+      definition: 'Sum of order value',
+      calculationLogic: 'SUM(amount)',
+      businessPurpose: 'Track sales',
+      dataSource: 'raw.orders',
+      frequency: 'daily',
+      owner: 'Sales Team',
+      tags: ['sales']
+    }
+  ]
+};
+
+describe('documentation-schema', () => {
+  describe('DOCUMENTATION_JSON_SCHEMA', () => {
+    it('should require every template field', () => {
+      expect(DOCUMENTATION_JSON_SCHEMA.required).toEqual(Object.keys(validDoc));
+      expect(DOCUMENTATION_JSON_SCHEMA.additionalProperties).toBe(false);
+    });
+  });
+
+  describe('parseDocumentation', () => {
+    it('should parse a valid documentation response', () => {
+      expect(parseDocumentation(JSON.stringify(validDoc))).toEqual({ status: 'ok', documentation: validDoc });
+    });
+
+    it('should accept documentation without KPIs', () => {
+      const { kpis: _kpis, ...withoutKpis } = validDoc;
+      expect(parseDocumentation(JSON.stringify(withoutKpis))).toEqual({ status: 'ok', documentation: withoutKpis });
+    });
+
+    it('should report invalid JSON', () => {
+      expect(parseDocumentation('{"description": "truncated')).toEqual({ status: 'invalid_json' });
+    });
+
+    it('should report a shape mismatch when required sections are missing or mistyped', () => {
+      const mistyped = { ...validDoc, dataSources: 'raw.orders' };
+      expect(parseDocumentation(JSON.stringify(mistyped))).toEqual({ status: 'shape_mismatch', value: mistyped });
+      expect(parseDocumentation(JSON.stringify({ ...validDoc, tableMetadata: [{ tableName: 't' }] })).status).toBe('shape_mismatch');
+      expect(parseDocumentation(JSON.stringify({ description: 'only a description' })).status).toBe('shape_mismatch');
+    });
+  });
+
+  describe('isDocumentation', () => {
+    it('should reject non-objects', () => {
+      expect(isDocumentation(null)).toBe(false);
+      expect(isDocumentation([validDoc])).toBe(false);
+      expect(isDocumentation('documentation')).toBe(false);
+    });
+  });
+
+  describe('maxDocumentationTokens', () => {
+    it('should give reasoning models room for their reasoning tokens', () => {
+      expect(maxDocumentationTokens('o3-2025-04-16')).toBe(100000);
+      expect(maxDocumentationTokens('o4-mini-2025-04-16')).toBe(100000);
+    });
+
+    it('should stay within the output limit of other models', () => {
+      expect(maxDocumentationTokens('gpt-4o-mini')).toBe(16000);
+      expect(maxDocumentationTokens('gpt-4.1-mini')).toBe(32000);
+    });
+  });
+
+  describe('maxPromptTokens', () => {
+    it('should leave the full documentation budget inside the context window', () => {
+      expect(maxPromptTokens('gpt-4o-mini')).toBe(128000 - 16000);
+      expect(maxPromptTokens('o3-2025-04-16')).toBe(200000 - 100000);
+    });
+  });
+});
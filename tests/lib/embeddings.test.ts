@@ -288,6 +288,20 @@ describe('Embeddings', () => {
       expect(results.combined[1].score).toBe(0.91);
       expect(results.combined[2].score).toBe(0.87);
     });
+
+    it('should embed the query once for all content types', async () => {
+      await hybridSearch('query', {
+        includeDocuments: true,
+        includeCode: true,
+        includeQA: true,
+        includeKPIs: true
+      });
+
+      const { getOpenAIClient } = await import('@/lib/openai-client');
+      const { searchVectors } = await import('@/lib/pinecone');
+      expect(getOpenAIClient().embeddings.create).toHaveBeenCalledTimes(1);
+      expect(searchVectors).toHaveBeenCalledTimes(4);
+    });
   });
 
   describe('getRelevantContext', () => {
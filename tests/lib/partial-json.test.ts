@@ -0,0 +1,56 @@
+import { describe, it, expect } from 'vitest';
+import { TopLevelSectionScanner } from '@/lib/partial-json';
+
+const fullDoc = {
+  description: 'Builds the {daily} sales summary, with "quoted" text',
+  tableGrain: 'order_id',
+  dataSources: ['raw.orders', 'raw.customers'],
+  tableMetadata: [
+    { tableName: 'sales_summary', columns: [{ columnName: 'order_id', dataType: 'string' }] }
+  ],
+  integratedRules: ['Filter cancelled orders']
+};
+
+// Feed the serialized document in small chunks, like a token stream
+function* chunks(str: string, size: number) {
+  for (let i = 0; i < str.length; i += size) yield str.slice(i, i + size);
+}
+
+describe('TopLevelSectionScanner', () => {
+  it('should return nothing before the first property closes', () => {
+    const scanner = new TopLevelSectionScanner();
+    expect(scanner.push('{"description": "Builds the')).toBe(false);
+    expect(scanner.completedSections()).toBeUndefined();
+  });
+
+  it('should expose completed top-level properties only', () => {
+    const scanner = new TopLevelSectionScanner();
+    scanner.push('{"description": "a, b", "dataSources": ["x", "y"], "tableMetadata": [{"tableName": "t"');
+
+    expect(scanner.completedSections()).toEqual({ description: 'a, b', dataSources: ['x', 'y'] });
+  });
+
+  it('should not treat braces, commas or escaped quotes inside strings as structure', () => {
+    const scanner = new TopLevelSectionScanner();
+    scanner.push('{"description": "x \\", {y}", "tableGrain": "z"');
+
+    expect(scanner.completedSections()).toEqual({ description: 'x ", {y}' });
+  });
+
+  it('should yield every section but the last, which arrives with the complete document', () => {
+    const scanner = new TopLevelSectionScanner();
+    const seen: Record<string, unknown>[] = [];
+
+    for (const chunk of chunks(JSON.stringify(fullDoc, null, 2), 7)) {
+      if (scanner.push(chunk)) {
+        const sections = scanner.completedSections();
+        if (sections) seen.push(sections);
+      }
+    }
+
+    const { integratedRules: _last, ...allButLast } = fullDoc;
+    expect(seen).toHaveLength(Object.keys(fullDoc).length - 1);
+    expect(Object.keys(seen[0])).toEqual(['description']);
+    expect(seen[seen.length - 1]).toEqual(allButLast);
+  });
+});
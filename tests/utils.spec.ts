@@ -1,6 +1,8 @@
 import { describe, it, expect } from 'vitest';
 import { safeJsonParse } from '@/lib/utils';
 import { decodeSSE } from '@/lib/utils';
+import { mapWithConcurrency } from '@/lib/utils';
+import { estimateTokens } from '@/lib/utils';
 
 describe('safeJsonParse', () => {
   it('parses valid JSON', () => {
@@ -284,4 +286,48 @@ describe('safeJsonParse', () => {
       console.log('✅ Successfully demonstrated how the bug could occur!');
     }
   });
-}); 
\ No newline at end of file
+}); 
+
+describe('mapWithConcurrency', () => {
+  it('returns results in input order', async () => {
+    const delays = [30, 10, 20, 0];
+    const results = await mapWithConcurrency(delays, 2, async (ms, idx) => {
+      await new Promise(resolve => setTimeout(resolve, ms));
+      return idx;
+    });
+
+    expect(results).toEqual([0, 1, 2, 3]);
+  });
+
+  it('never runs more than the limit at once', async () => {
+    let inFlight = 0;
+    let maxInFlight = 0;
+
+    await mapWithConcurrency(Array.from({ length: 10 }, (_, i) => i), 3, async () => {
+      inFlight++;
+      maxInFlight = Math.max(maxInFlight, inFlight);
+      await new Promise(resolve => setTimeout(resolve, 5));
+      inFlight--;
+    });
+
+    expect(maxInFlight).toBe(3);
+  });
+
+  it('handles an empty list', async () => {
+    expect(await mapWithConcurrency([], 5, async (x) => x)).toEqual([]);
+  });
+});
+
+describe('estimateTokens', () => {
+  it('estimates roughly four characters per token', () => {
+    expect(estimateTokens('')).toBe(0);
+    expect(estimateTokens('abcd')).toBe(1);
+    expect(estimateTokens('abcde')).toBe(2);
+    expect(estimateTokens('x'.repeat(400000))).toBe(100000);
+  });
+
+  it('accepts a custom characters-per-token ratio', () => {
+    expect(estimateTokens('abc', 3)).toBe(1);
+    expect(estimateTokens('abcd', 3)).toBe(2);
+  });
+});